@@ -1,29 +1,258 @@
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from scipy.stats import norm
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from functools import lru_cache
+from typing import NamedTuple
 import requests
-import traceback
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Normal distribution constants: 1/sqrt(2*pi) and 1/sqrt(2)
+_INV_SQRT_2PI = 0.3989422804014327
+_INV_SQRT_2 = 0.7071067811865476
+
+# IV floor applied before Black-Scholes (avoids division by zero in d1)
+_MIN_IV = 0.01
+
+# Optional JIT acceleration for the Greeks kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional faster JSON decoding for the (large) option chain payload
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # Serial on purpose: a few dozen strikes gain nothing from prange, and a
+    # parallel kernel entered from two threads aborts under numba's workqueue layer
+    @njit(fastmath=True, cache=True)
+    def _bs_greeks(S, K, T, r, civ, piv, cg, pg, cd, pd_):
+        """Fused call/put gamma and delta in a single pass over the strikes"""
+        sqrtT = math.sqrt(T)
+        rT = r * T
+        half_T = 0.5 * T
+        for i in range(K.shape[0]):
+            log_sk = math.log(S / K[i])
+            d1c = (log_sk + rT + half_T * civ[i] * civ[i]) / (civ[i] * sqrtT)
+            d1p = (log_sk + rT + half_T * piv[i] * piv[i]) / (piv[i] * sqrtT)
+            cg[i] = _INV_SQRT_2PI * math.exp(-0.5 * d1c * d1c) / (S * civ[i] * sqrtT)
+            pg[i] = _INV_SQRT_2PI * math.exp(-0.5 * d1p * d1p) / (S * piv[i] * sqrtT)
+            # erfc keeps full precision in the far OTM tails (matches ndtr)
+            cd[i] = 0.5 * math.erfc(-d1c * _INV_SQRT_2)
+            pd_[i] = -0.5 * math.erfc(d1p * _INV_SQRT_2)
+    
+    # Compile at import so the first dashboard request doesn't pay the JIT cost;
+    # if compilation fails, fall back to the NumPy path instead of failing the import
+    try:
+        _warmup = np.ones(1)
+        _bs_greeks(1.0, _warmup, 1.0, 0.0, _warmup, _warmup,
+                   np.empty(1), np.empty(1), np.empty(1), np.empty(1))
+        del _warmup
+    except Exception as e:
+        logger.warning("⚠️ Numba Greeks kernel unavailable, using NumPy: %s", e)
+        NUMBA_AVAILABLE = False
+
+# Security ID mapping (from DhanHQ instrument list)
+_SECURITY_MAP = {"NIFTY": 13, "BANKNIFTY": 25, "FINNIFTY": 27, "MIDCPNIFTY": 442}
+
+# Fallback index prices when the chain has no LTP
+_DEFAULT_PRICES = {"NIFTY": 24500, "BANKNIFTY": 52000, "FINNIFTY": 22500, "MIDCPNIFTY": 12000}
+
+# Record layout returned by detect_gamma_flip_zones
+FLIP_ZONE_DTYPE = np.dtype([('lower_strike', 'f8'), ('upper_strike', 'f8')])
+
+class FlowResult(NamedTuple):
+    """Near-ATM flow metrics returned by calculate_dual_gex_dex_flow"""
+    gex_near_total: float
+    dex_near_total: float
+    gex_near_bias: str
+    dex_near_bias: str
+    
+    @property
+    def combined_bias(self):
+        return f"{self.gex_near_bias} + {self.dex_near_bias}"
+
+# Columns produced by EnhancedGEXDEXCalculator.parse_option_chain_response
+_CHAIN_COLUMNS = (
+    'Strike',
+    'Call_OI', 'Call_IV', 'Call_LTP', 'Call_Volume',
+    'Call_Delta_API', 'Call_Gamma_API', 'Call_Theta', 'Call_Vega',
+    'Put_OI', 'Put_IV', 'Put_LTP', 'Put_Volume',
+    'Put_Delta_API', 'Put_Gamma_API', 'Put_Theta', 'Put_Vega'
+)
+
+# Shared keep-alive session so consecutive calls reuse the TLS connection.
+# Only failed connects are retried - the POST never reached DhanHQ, so the
+# rate-limit window is untouched. Read timeouts and 5xx responses are not
+# retried: a resend would land inside the 3-second window and a stalled
+# endpoint would block for several read timeouts before surfacing.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=False,
+        status=0,
+        backoff_factor=0.2
+    )
+))
+
+# (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# In-process response cache: {key: (timestamp, value)}
+EXPIRY_LIST_TTL = 3600    # seconds - expiries only change day to day
+OPTION_CHAIN_TTL = 10     # seconds
+_RESPONSE_CACHE = {}
+
+# DhanHQ allows 1 option chain request per 3 seconds
+MIN_REQUEST_INTERVAL = 3.0
+_next_chain_slot = 0.0
+_rate_limit_lock = threading.Lock()
+
+def _cache_get(key, ttl):
+    """Return a cached response if it is younger than ttl seconds"""
+    entry = _RESPONSE_CACHE.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    _RESPONSE_CACHE.pop(key, None)
+    return None
+
+def _cache_put(key, value):
+    """Store a response, first dropping entries that can no longer be served"""
+    now = time.monotonic()
+    today = date.today()
+    # Nothing outlives the longest TTL; day-keyed entries also go at midnight
+    for old_key, (stamp, _) in list(_RESPONSE_CACHE.items()):
+        if now - stamp >= EXPIRY_LIST_TTL or (isinstance(old_key[-1], date) and old_key[-1] != today):
+            _RESPONSE_CACHE.pop(old_key, None)
+    _RESPONSE_CACHE[key] = (now, value)
+
+def _respect_rate_limit():
+    """Wait for the next free option chain slot
+    
+    The slot is reserved under the lock but the sleep happens outside it, so
+    concurrent callers queue for their own slots without serialising anything
+    else behind the lock.
+    """
+    global _next_chain_slot
+    with _rate_limit_lock:
+        now = time.monotonic()
+        slot = max(now, _next_chain_slot)
+        _next_chain_slot = slot + MIN_REQUEST_INTERVAL
+    if slot > now:
+        time.sleep(slot - now)
+
+def _nearest_strike_index(strikes, price):
+    """Position of the strike closest to price in an ascending strikes array"""
+    pos = int(np.searchsorted(strikes, price))
+    if pos == 0:
+        return 0
+    if pos == len(strikes):
+        return pos - 1
+    return pos if strikes[pos] - price < price - strikes[pos - 1] else pos - 1
+
+def _post(url, payload, headers, rate_limited=False):
+    """POST to DhanHQ through the shared session
+    
+    rate_limited requests (the option chain) are spaced MIN_REQUEST_INTERVAL apart.
+    """
+    if rate_limited:
+        _respect_rate_limit()
+    return _SESSION.post(url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT)
+
+def _parse_json(response):
+    """Decode a JSON response body, straight from bytes when orjson is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+@lru_cache(maxsize=32)
+def _days_to_expiry(expiry_str, today_ordinal):
+    """Whole days left before the expiry date starts (minimum 1)
+    
+    Keyed by today's ordinal so cached values roll over at midnight.
+    Unparseable expiries fall back to one week out.
+    """
+    expiry_ordinal = today_ordinal + 7
+    for fmt in ('%Y-%m-%d', '%d-%b-%Y'):
+        try:
+            expiry_ordinal = datetime.strptime(expiry_str, fmt).toordinal()
+            break
+        except (ValueError, TypeError):
+            continue
+    return max(expiry_ordinal - today_ordinal - 1, 1)
 
 class BlackScholesCalculator:
     @staticmethod
     def calculate_gamma(S, K, T, r, sigma):
         if T <= 0 or sigma <= 0:
             return 0.0
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
+        sqrtT = math.sqrt(T)
+        d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrtT)
+        gamma = _INV_SQRT_2PI * math.exp(-0.5 * d1 * d1) / (S * sigma * sqrtT)
         return gamma
     
     @staticmethod
     def calculate_delta(S, K, T, r, sigma, option_type='call'):
         if T <= 0 or sigma <= 0:
             return 0.0
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+        d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * math.sqrt(T))
+        # erfc form avoids cancellation in the tails: N(d1) and N(d1) - 1 = -N(-d1)
         if option_type.lower() == 'call':
-            delta = norm.cdf(d1)
+            delta = 0.5 * math.erfc(-d1 * _INV_SQRT_2)
         else:
-            delta = norm.cdf(d1) - 1
+            delta = -0.5 * math.erfc(d1 * _INV_SQRT_2)
         return delta
+    
+    @staticmethod
+    def calculate_greeks_vec(S, K_arr, T, r, call_sigma, put_sigma):
+        """Call/put gamma and delta in one pass, sharing log(S/K) and sqrt(T)
+        
+        Returns (call_gamma, put_gamma, call_delta, put_delta) arrays.
+        """
+        K_arr = np.asarray(K_arr, dtype=np.float64)
+        call_sigma = np.asarray(call_sigma, dtype=np.float64)
+        put_sigma = np.asarray(put_sigma, dtype=np.float64)
+        if T <= 0:
+            zeros = np.zeros_like(K_arr)
+            return zeros, zeros.copy(), zeros.copy(), zeros.copy()
+        sqrtT = math.sqrt(T)
+        from scipy.special import ndtr  # deferred: only the NumPy path needs SciPy
+        
+        # log(S/K) + r*T is shared by both sides; only the variance term differs
+        drift = np.log(S / K_arr) + r * T
+        half_T = 0.5 * T
+        
+        call_vol = call_sigma * sqrtT
+        d1_c = (drift + half_T * call_sigma * call_sigma) / call_vol
+        call_gamma = _INV_SQRT_2PI * np.exp(-0.5 * d1_c * d1_c) / (S * call_vol)
+        call_delta = ndtr(d1_c)
+        
+        put_vol = put_sigma * sqrtT
+        d1_p = (drift + half_T * put_sigma * put_sigma) / put_vol
+        put_gamma = _INV_SQRT_2PI * np.exp(-0.5 * d1_p * d1_p) / (S * put_vol)
+        put_delta = ndtr(d1_p) - 1
+        
+        return call_gamma, put_gamma, call_delta, put_delta
 
 class EnhancedGEXDEXCalculator:
     """GEX/DEX Calculator using DhanHQ REST API v2"""
@@ -35,38 +264,46 @@ class EnhancedGEXDEXCalculator:
         self.access_token = str(access_token).strip() if access_token else None
         self.base_url = "https://api.dhan.co/v2"
         
-        if self.client_id and self.access_token:
-            print(f"✅ DhanHQ API configured")
-            print(f"   Client ID: {self.client_id}")
-            print(f"   Token length: {len(self.access_token)} characters")
-    
-    def get_expiry_list(self, security_id, exchange_segment="IDX_I"):
-        """Get expiry list from DhanHQ - Official API v2"""
-        
-        url = f"{self.base_url}/optionchain/expirylist"
-        
-        headers = {
+        # Request headers are fixed per credential set - build them once
+        self._headers = {
             "access-token": self.access_token,
             "client-id": self.client_id,
             "Content-Type": "application/json"
         }
         
+        if self.client_id and self.access_token:
+            logger.info("✅ DhanHQ API configured (client %s, token %d chars)",
+                        self.client_id, len(self.access_token))
+    
+    def get_expiry_list(self, security_id, exchange_segment="IDX_I", use_cache=True):
+        """Get expiry list from DhanHQ - Official API v2
+        
+        use_cache=False always hits the API (the fresh result is still cached).
+        """
+        
+        url = f"{self.base_url}/optionchain/expirylist"
+        
         payload = {
             "UnderlyingScrip": int(security_id),
             "UnderlyingSeg": str(exchange_segment)
         }
         
+        # Keyed by day too, so a list cached late in a session never outlives its date
+        cache_key = ('expirylist', self.client_id, payload["UnderlyingScrip"],
+                     payload["UnderlyingSeg"], date.today())
+        cached = _cache_get(cache_key, EXPIRY_LIST_TTL) if use_cache else None
+        if cached is not None:
+            logger.debug("📦 Using cached expiry list (%d expiries)", len(cached))
+            return cached
+        
         try:
-            print(f"\n📡 Calling DhanHQ Expiry List API...")
-            print(f"   URL: {url}")
-            print(f"   Payload: {payload}")
+            logger.debug("📡 Calling DhanHQ Expiry List API url=%s payload=%s", url, payload)
             
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+            response = _post(url, payload, self._headers)
             
-            print(f"📊 Response Status: {response.status_code}")
-            print(f"📊 Response Text (first 500 chars): {response.text[:500]}")
+            logger.debug("📊 Response Status: %s", response.status_code)
             
-            # Handle specific HTTP errors
+            # Handle specific HTTP errors (status only - the body is decoded once, below)
             if response.status_code == 401:
                 raise Exception("Authentication failed. Access Token may be expired. Please regenerate at https://www.dhan.co/")
             
@@ -80,11 +317,13 @@ class EnhancedGEXDEXCalculator:
                 raise Exception(f"HTTP {response.status_code}: {response.text}")
             
             # Parse response
-            data = response.json()
+            data = _parse_json(response)
             
-            print(f"✅ Response received")
-            print(f"   Full Response Keys: {data.keys() if isinstance(data, dict) else 'Not a dict'}")
-            print(f"   Status: {data.get('status', 'unknown')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📊 Response Text (first 500 chars): %s", response.text[:500])
+            
+            logger.debug("✅ Response received, status: %s",
+                         data.get('status', 'unknown') if isinstance(data, dict) else 'Not a dict')
             
             # FIXED: DhanHQ API v2 response structure
             # Response: {"data": ["2024-10-17", ...], "status": "success"}
@@ -94,7 +333,8 @@ class EnhancedGEXDEXCalculator:
                 if not expiries or len(expiries) == 0:
                     raise Exception("No expiries available. Market may be closed or there are no active option contracts.")
                 
-                print(f"✅ Found {len(expiries)} expiries: {expiries[:3]}...")
+                logger.debug("✅ Found %d expiries: %s...", len(expiries), expiries[:3])
+                _cache_put(cache_key, expiries)
                 return expiries
             else:
                 # Handle error response
@@ -114,16 +354,13 @@ class EnhancedGEXDEXCalculator:
             error_msg = str(e) if str(e) else "Unknown error occurred"
             raise Exception(error_msg)
     
-    def get_option_chain(self, security_id, exchange_segment, expiry):
-        """Get option chain from DhanHQ - Official API v2"""
+    def get_option_chain(self, security_id, exchange_segment, expiry, use_cache=True):
+        """Get option chain from DhanHQ - Official API v2
         
-        url = f"{self.base_url}/optionchain"
+        use_cache=False always hits the API (the fresh result is still cached).
+        """
         
-        headers = {
-            "access-token": self.access_token,
-            "client-id": self.client_id,
-            "Content-Type": "application/json"
-        }
+        url = f"{self.base_url}/optionchain"
         
         payload = {
             "UnderlyingScrip": int(security_id),
@@ -131,14 +368,18 @@ class EnhancedGEXDEXCalculator:
             "Expiry": str(expiry)
         }
         
+        cache_key = ('optionchain', self.client_id, payload["UnderlyingScrip"], payload["UnderlyingSeg"], payload["Expiry"])
+        cached = _cache_get(cache_key, OPTION_CHAIN_TTL) if use_cache else None
+        if cached is not None:
+            logger.debug("📦 Using cached option chain for %s", expiry)
+            return cached
+        
         try:
-            print(f"\n📡 Calling DhanHQ Option Chain API...")
-            print(f"   Expiry: {expiry}")
-            print(f"   Payload: {payload}")
+            logger.debug("📡 Calling DhanHQ Option Chain API expiry=%s payload=%s", expiry, payload)
             
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
+            response = _post(url, payload, self._headers, rate_limited=True)
             
-            print(f"📊 Response Status: {response.status_code}")
+            logger.debug("📊 Response Status: %s", response.status_code)
             
             if response.status_code == 401:
                 raise Exception("Authentication failed. Access Token may be expired.")
@@ -152,16 +393,14 @@ class EnhancedGEXDEXCalculator:
             if response.status_code != 200:
                 raise Exception(f"HTTP {response.status_code}: {response.text}")
             
-            data = response.json()
-            
-            print(f"📊 Response Keys: {data.keys() if isinstance(data, dict) else 'Not a dict'}")
+            data = _parse_json(response)
             
             # FIXED: DhanHQ API v2 response structure
             # Response: {"data": {"last_price": 24964.25, "oc": {...}}}
             if 'data' in data:
                 option_data = data['data']
-                print(f"✅ Option chain data received")
-                print(f"   Data Keys: {option_data.keys() if isinstance(option_data, dict) else 'Not a dict'}")
+                logger.debug("✅ Option chain data received")
+                _cache_put(cache_key, option_data)
                 return option_data
             else:
                 error_msg = data.get('remarks', data.get('message', data.get('error', 'No data in response')))
@@ -173,15 +412,12 @@ class EnhancedGEXDEXCalculator:
     
     def get_underlying_price(self, symbol="NIFTY"):
         """Get index price - fallback defaults"""
-        defaults = {"NIFTY": 24500, "BANKNIFTY": 52000, "FINNIFTY": 22500, "MIDCPNIFTY": 12000}
-        return defaults.get(symbol, 24500)
+        return _DEFAULT_PRICES.get(symbol, 24500)
     
     def parse_option_chain_response(self, option_chain_data):
         """Parse DhanHQ option chain - Official response structure"""
         
         try:
-            parsed_data = []
-            
             # FIXED: Get underlying LTP from response
             # Response structure: {"last_price": 24964.25, "oc": {...}}
             underlying_ltp = float(option_chain_data.get('last_price', 0))
@@ -192,98 +428,78 @@ class EnhancedGEXDEXCalculator:
             if not oc:
                 raise Exception("No option chain data ('oc') in response")
             
-            print(f"\n📊 Parsing option chain...")
-            print(f"   Underlying LTP: ₹{underlying_ltp:,.2f}")
-            print(f"   Total strikes: {len(oc)}")
+            logger.debug("📊 Parsing option chain: LTP ₹%.2f, %d strikes", underlying_ltp, len(oc))
             
-            # Parse each strike
+            # Parse each strike into one row tuple (column order: _CHAIN_COLUMNS)
+            rows = []
             for strike_str, strike_data in oc.items():
+                # FIXED: DhanHQ uses 'ce' and 'pe', Greeks nested under 'greeks'.
+                # Missing or null legs/fields default explicitly instead of raising.
+                ce_data = strike_data.get('ce') or {}
+                pe_data = strike_data.get('pe') or {}
+                ce_greeks = ce_data.get('greeks') or {}
+                pe_greeks = pe_data.get('greeks') or {}
+                ce_iv = ce_data.get('implied_volatility')
+                pe_iv = pe_data.get('implied_volatility')
+                
                 try:
-                    strike = float(strike_str)
-                    
-                    # FIXED: Get CE (Call) data - DhanHQ uses 'ce' and 'pe'
-                    ce_data = strike_data.get('ce', {})
-                    call_oi = int(ce_data.get('oi', 0))
-                    call_iv = float(ce_data.get('implied_volatility', 15))
-                    call_ltp = float(ce_data.get('last_price', 0))
-                    call_volume = int(ce_data.get('volume', 0))
-                    
-                    # Get Greeks if available (DhanHQ provides them!)
-                    ce_greeks = ce_data.get('greeks', {})
-                    call_delta_api = float(ce_greeks.get('delta', 0))
-                    call_gamma_api = float(ce_greeks.get('gamma', 0))
-                    call_theta = float(ce_greeks.get('theta', 0))
-                    call_vega = float(ce_greeks.get('vega', 0))
-                    
-                    # FIXED: Get PE (Put) data
-                    pe_data = strike_data.get('pe', {})
-                    put_oi = int(pe_data.get('oi', 0))
-                    put_iv = float(pe_data.get('implied_volatility', 15))
-                    put_ltp = float(pe_data.get('last_price', 0))
-                    put_volume = int(pe_data.get('volume', 0))
-                    
-                    # Get Put Greeks
-                    pe_greeks = pe_data.get('greeks', {})
-                    put_delta_api = float(pe_greeks.get('delta', 0))
-                    put_gamma_api = float(pe_greeks.get('gamma', 0))
-                    put_theta = float(pe_greeks.get('theta', 0))
-                    put_vega = float(pe_greeks.get('vega', 0))
-                    
-                    # Convert IV from percentage to decimal if needed
-                    call_iv_decimal = call_iv / 100 if call_iv > 1 else call_iv
-                    put_iv_decimal = put_iv / 100 if put_iv > 1 else put_iv
-                    
-                    parsed_data.append({
-                        'Strike': strike,
-                        'Call_OI': call_oi,
-                        'Call_IV': call_iv_decimal,
-                        'Call_LTP': call_ltp,
-                        'Call_Volume': call_volume,
-                        'Call_Delta_API': call_delta_api,
-                        'Call_Gamma_API': call_gamma_api,
-                        'Call_Theta': call_theta,
-                        'Call_Vega': call_vega,
-                        'Put_OI': put_oi,
-                        'Put_IV': put_iv_decimal,
-                        'Put_LTP': put_ltp,
-                        'Put_Volume': put_volume,
-                        'Put_Delta_API': put_delta_api,
-                        'Put_Gamma_API': put_gamma_api,
-                        'Put_Theta': put_theta,
-                        'Put_Vega': put_vega
-                    })
-                    
-                except (ValueError, KeyError, TypeError) as e:
-                    print(f"⚠️ Error parsing strike {strike_str}: {str(e)}")
+                    rows.append((
+                        float(strike_str),
+                        int(ce_data.get('oi') or 0),
+                        float(15 if ce_iv is None else ce_iv),
+                        float(ce_data.get('last_price') or 0),
+                        int(ce_data.get('volume') or 0),
+                        float(ce_greeks.get('delta') or 0),
+                        float(ce_greeks.get('gamma') or 0),
+                        float(ce_greeks.get('theta') or 0),
+                        float(ce_greeks.get('vega') or 0),
+                        int(pe_data.get('oi') or 0),
+                        float(15 if pe_iv is None else pe_iv),
+                        float(pe_data.get('last_price') or 0),
+                        int(pe_data.get('volume') or 0),
+                        float(pe_greeks.get('delta') or 0),
+                        float(pe_greeks.get('gamma') or 0),
+                        float(pe_greeks.get('theta') or 0),
+                        float(pe_greeks.get('vega') or 0)
+                    ))
+                except (ValueError, TypeError) as e:
+                    # Only reached for malformed (non-numeric) values
+                    logger.warning("⚠️ Error parsing strike %s: %s", strike_str, e)
                     continue
             
-            if not parsed_data:
+            if not rows:
                 raise Exception("No valid strike data found in option chain")
             
-            print(f"✅ Successfully parsed {len(parsed_data)} strikes")
+            # Transpose into a dict of column arrays (SoA)
+            parsed_data = {name: np.asarray(col) for name, col in zip(_CHAIN_COLUMNS, zip(*rows))}
+            
+            # Convert IV from percentage to decimal if needed
+            for col in ('Call_IV', 'Put_IV'):
+                iv = parsed_data[col]
+                parsed_data[col] = np.where(iv > 1, iv / 100, iv)
+            
+            logger.debug("✅ Successfully parsed %d strikes", len(rows))
             
             return parsed_data, underlying_ltp
             
         except Exception as e:
-            print(f"❌ Parse error: {str(e)}")
+            logger.error("❌ Parse error: %s", e)
             raise Exception(f"Failed to parse option chain: {str(e)}")
     
     def fetch_and_calculate_gex_dex(self, symbol="NIFTY", strikes_range=12, expiry_index=0):
-        """Main calculation function"""
+        """Main calculation function
+        
+        The returned DataFrame is sorted by ascending Strike with a default
+        RangeIndex, which lets the flow/flip helpers skip re-sorting it.
+        """
         
         try:
-            print(f"\n{'='*70}")
-            print(f"  NYZTrade GEX/DEX Analysis - {symbol}")
-            print(f"{'='*70}")
-            
-            # Security ID mapping (from DhanHQ instrument list)
-            security_map = {"NIFTY": 13, "BANKNIFTY": 25, "FINNIFTY": 27, "MIDCPNIFTY": 442}
-            security_id = security_map.get(symbol, 13)
+            security_id = _SECURITY_MAP.get(symbol, 13)
             
-            print(f"\n   Security ID for {symbol}: {security_id}")
+            logger.debug("NYZTrade GEX/DEX Analysis - %s (security ID %s)", symbol, security_id)
             
-            # STEP 1: Get expiry list
-            print(f"\n[STEP 1] Fetching expiry list...")
+            # STEP 1: Get expiry list (served from the response cache when fresh)
+            logger.debug("[STEP 1] Fetching expiry list...")
             expiries = self.get_expiry_list(security_id, "IDX_I")
             
             # Select expiry
@@ -291,199 +507,209 @@ class EnhancedGEXDEXCalculator:
                 expiry_index = 0
             
             selected_expiry = expiries[expiry_index]
-            print(f"📅 Selected expiry: {selected_expiry}")
+            
+            logger.debug("📅 Selected expiry: %s", selected_expiry)
             
             # STEP 2: Get option chain
-            print(f"\n[STEP 2] Fetching option chain...")
-            import time
-            time.sleep(3)  # Rate limit: 1 request per 3 seconds
+            logger.debug("[STEP 2] Fetching option chain...")
             option_chain_data = self.get_option_chain(security_id, "IDX_I", selected_expiry)
             
             # STEP 3: Parse data
-            print(f"\n[STEP 3] Parsing option data...")
-            parsed_data, underlying_price = self.parse_option_chain_response(option_chain_data)
+            logger.debug("[STEP 3] Parsing option data...")
+            cols, underlying_price = self.parse_option_chain_response(option_chain_data)
             
             # Use fallback if no LTP
             if underlying_price == 0:
                 underlying_price = self.get_underlying_price(symbol)
-                print(f"   Using fallback price: ₹{underlying_price:,.2f}")
-            
-            # Create DataFrame
-            df = pd.DataFrame(parsed_data)
+                logger.warning("Using fallback price for %s: ₹%.2f", symbol, underlying_price)
             
             # STEP 4: Filter strikes
-            print(f"\n[STEP 4] Filtering strikes...")
+            logger.debug("[STEP 4] Filtering strikes...")
             strike_step = 50 if symbol in ["NIFTY", "FINNIFTY"] else 100
             range_points = strikes_range * strike_step
             
-            df = df[
-                (df['Strike'] >= underlying_price - range_points) &
-                (df['Strike'] <= underlying_price + range_points)
-            ].copy()
-            
-            if len(df) == 0:
+            # Order strikes once (the ATM lookup relies on it), then find the
+            # window edges by binary search and gather every column once
+            strikes = cols['Strike']
+            order = np.argsort(strikes, kind='stable')
+            sorted_strikes = strikes[order]
+            lo = np.searchsorted(sorted_strikes, underlying_price - range_points, side='left')
+            hi = np.searchsorted(sorted_strikes, underlying_price + range_points, side='right')
+            rows = order[lo:hi]
+            cols = {name: arr[rows] for name, arr in cols.items()}
+            n_strikes = len(cols['Strike'])
+            
+            if n_strikes == 0:
                 raise Exception(f"No strikes in range ±{range_points} from ₹{underlying_price:,.0f}")
             
-            print(f"✅ {len(df)} strikes in analysis range")
+            logger.debug("✅ %d strikes in analysis range", n_strikes)
             
             # STEP 5: Calculate time to expiry
-            print(f"\n[STEP 5] Calculating time to expiry...")
-            try:
-                expiry_date = datetime.strptime(selected_expiry, '%Y-%m-%d')
-            except:
-                expiry_date = datetime.now() + timedelta(days=7)
-            
-            days_to_expiry = max((expiry_date - datetime.now()).days, 1)
+            logger.debug("[STEP 5] Calculating time to expiry...")
+            days_to_expiry = _days_to_expiry(selected_expiry, datetime.now().toordinal())
             T = days_to_expiry / 365.0
-            print(f"📅 Days to expiry: {days_to_expiry} | T = {T:.4f}")
+            logger.debug("📅 Days to expiry: %d | T = %.4f", days_to_expiry, T)
             
             # STEP 6: Use API Greeks or Calculate
-            print(f"\n[STEP 6] Processing Greeks...")
+            logger.debug("[STEP 6] Processing Greeks...")
             
             # Check if API provides Greeks
-            has_api_greeks = df['Call_Gamma_API'].abs().sum() > 0
+            has_api_greeks = np.abs(cols['Call_Gamma_API']).sum() > 0
             
             if has_api_greeks:
-                print("   Using DhanHQ API Greeks (delta, gamma from API)")
-                df['Call_Gamma'] = df['Call_Gamma_API']
-                df['Put_Gamma'] = df['Put_Gamma_API']
-                df['Call_Delta'] = df['Call_Delta_API']
-                df['Put_Delta'] = df['Put_Delta_API']
+                logger.debug("Using DhanHQ API Greeks (delta, gamma from API)")
+                call_gamma = cols['Call_Gamma_API']
+                put_gamma = cols['Put_Gamma_API']
+                call_delta = cols['Call_Delta_API']
+                put_delta = cols['Put_Delta_API']
             else:
-                print("   Calculating Greeks using Black-Scholes...")
-                df['Call_Gamma'] = df.apply(
-                    lambda r: self.bs_calc.calculate_gamma(
-                        underlying_price, r['Strike'], T, self.risk_free_rate, max(r['Call_IV'], 0.01)
-                    ), axis=1
-                )
-                
-                df['Put_Gamma'] = df.apply(
-                    lambda r: self.bs_calc.calculate_gamma(
-                        underlying_price, r['Strike'], T, self.risk_free_rate, max(r['Put_IV'], 0.01)
-                    ), axis=1
-                )
+                logger.debug("Calculating Greeks using Black-Scholes...")
+                K = cols['Strike'].astype(np.float64, copy=False)
+                civ = np.maximum(cols['Call_IV'].astype(np.float64, copy=False), _MIN_IV)
+                piv = np.maximum(cols['Put_IV'].astype(np.float64, copy=False), _MIN_IV)
+                r = self.risk_free_rate
                 
-                df['Call_Delta'] = df.apply(
-                    lambda r: self.bs_calc.calculate_delta(
-                        underlying_price, r['Strike'], T, self.risk_free_rate, max(r['Call_IV'], 0.01), 'call'
-                    ), axis=1
-                )
-                
-                df['Put_Delta'] = df.apply(
-                    lambda r: self.bs_calc.calculate_delta(
-                        underlying_price, r['Strike'], T, self.risk_free_rate, max(r['Put_IV'], 0.01), 'put'
-                    ), axis=1
-                )
+                if NUMBA_AVAILABLE:
+                    n = len(K)
+                    call_gamma, put_gamma = np.empty(n), np.empty(n)
+                    call_delta, put_delta = np.empty(n), np.empty(n)
+                    _bs_greeks(float(underlying_price), K, T, r, civ, piv,
+                               call_gamma, put_gamma, call_delta, put_delta)
+                else:
+                    call_gamma, put_gamma, call_delta, put_delta = self.bs_calc.calculate_greeks_vec(
+                        underlying_price, K, T, r, civ, piv
+                    )
             
             # STEP 7: Calculate GEX and DEX
-            print(f"\n[STEP 7] Calculating GEX and DEX...")
+            logger.debug("[STEP 7] Calculating GEX and DEX...")
             
             # GEX Calculation: Gamma * OI * Spot^2 * 0.01
             # Call GEX is positive (dealers are short calls, need to buy on rise)
             # Put GEX is negative (dealers are short puts, need to sell on rise)
-            df['Call_GEX'] = df['Call_Gamma'] * df['Call_OI'] * underlying_price * underlying_price * 0.01
-            df['Put_GEX'] = df['Put_Gamma'] * df['Put_OI'] * underlying_price * underlying_price * 0.01 * -1
-            df['Net_GEX'] = df['Call_GEX'] + df['Put_GEX']
-            df['Net_GEX_B'] = df['Net_GEX'] / 1e9
+            S = float(underlying_price)
+            gex_scale = S * S * 0.01
+            dex_scale = S * 0.01
+            
+            call_oi = cols['Call_OI']
+            put_oi = cols['Put_OI']
+            
+            # Scale in place so each product allocates a single output buffer
+            call_gex = np.multiply(call_gamma, call_oi)
+            call_gex *= gex_scale
+            put_gex = np.multiply(put_gamma, put_oi)
+            put_gex *= -gex_scale
+            net_gex = call_gex + put_gex
             
             # DEX Calculation: Delta * OI * Spot * 0.01
-            df['Call_DEX'] = df['Call_Delta'] * df['Call_OI'] * underlying_price * 0.01
-            df['Put_DEX'] = df['Put_Delta'] * df['Put_OI'] * underlying_price * 0.01
-            df['Net_DEX'] = df['Call_DEX'] + df['Put_DEX']
-            df['Net_DEX_B'] = df['Net_DEX'] / 1e9
+            call_dex = np.multiply(call_delta, call_oi)
+            call_dex *= dex_scale
+            put_dex = np.multiply(put_delta, put_oi)
+            put_dex *= dex_scale
+            net_dex = call_dex + put_dex
             
             # Additional metrics
-            total_gex = df['Net_GEX'].abs().sum()
-            df['Hedging_Pressure'] = (df['Net_GEX'] / total_gex * 100) if total_gex > 0 else 0
-            df['Total_Volume'] = df['Call_Volume'] + df['Put_Volume']
+            total_gex = np.abs(net_gex).sum()
+            hedging_pressure = (net_gex / total_gex * 100) if total_gex > 0 else np.zeros(n_strikes)
+            
+            cols.update(
+                Call_Gamma=call_gamma, Put_Gamma=put_gamma,
+                Call_Delta=call_delta, Put_Delta=put_delta,
+                Call_GEX=call_gex, Put_GEX=put_gex,
+                Net_GEX=net_gex, Net_GEX_B=net_gex / 1e9,
+                Call_DEX=call_dex, Put_DEX=put_dex,
+                Net_DEX=net_dex, Net_DEX_B=net_dex / 1e9,
+                Hedging_Pressure=hedging_pressure,
+                Total_Volume=cols['Call_Volume'] + cols['Put_Volume']
+            )
+            
+            # Build the DataFrame once, from the finished column arrays
+            df = pd.DataFrame(cols)
             
             # ATM info
-            atm_strike = df.iloc[(df['Strike'] - underlying_price).abs().argsort().iloc[0]]['Strike']
-            atm_row = df[df['Strike'] == atm_strike].iloc[0]
+            atm_pos = _nearest_strike_index(cols['Strike'], underlying_price)
             
             atm_info = {
-                'atm_strike': int(atm_strike),
-                'atm_straddle_premium': atm_row['Call_LTP'] + atm_row['Put_LTP'],
+                'atm_strike': int(cols['Strike'][atm_pos]),
+                'atm_straddle_premium': cols['Call_LTP'][atm_pos] + cols['Put_LTP'][atm_pos],
                 'expiry_date': selected_expiry,
                 'days_to_expiry': days_to_expiry
             }
             
-            print(f"\n{'='*70}")
-            print(f"  ✅ CALCULATION COMPLETE!")
-            print(f"  Underlying: ₹{underlying_price:,.2f}")
-            print(f"  Total Net GEX: {df['Net_GEX_B'].sum():.4f}B")
-            print(f"  ATM Strike: {atm_info['atm_strike']}")
-            print(f"  ATM Straddle: ₹{atm_info['atm_straddle_premium']:.2f}")
-            print(f"{'='*70}\n")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✅ %s: underlying ₹%.2f, net GEX %.4fB, ATM %d, straddle ₹%.2f",
+                            symbol, underlying_price, net_gex.sum() / 1e9,
+                            atm_info['atm_strike'], atm_info['atm_straddle_premium'])
             
             return df, underlying_price, "DhanHQ API v2", atm_info
             
         except Exception as e:
             error_msg = str(e) if str(e) else "Unknown error occurred"
-            print(f"\n{'='*70}")
-            print(f"  ❌ ERROR: {error_msg}")
-            print(f"{'='*70}\n")
-            print(f"Full traceback:")
-            print(traceback.format_exc())
+            logger.exception("❌ GEX/DEX calculation failed for %s: %s", symbol, error_msg)
             raise Exception(error_msg)
+    
+    def fetch_many(self, symbols, strikes_range=12, expiry_index=0, max_workers=4):
+        """Fetch several symbols concurrently
+        
+        Returns {symbol: (df, underlying_price, fetch_method, atm_info)}; a symbol
+        that failed maps to its Exception instead. Expiry lists and the parse/
+        Greeks work overlap freely; option chain requests still take turns in
+        the shared 3-second rate limit.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                symbol: executor.submit(self.fetch_and_calculate_gex_dex, symbol, strikes_range, expiry_index)
+                for symbol in symbols
+            }
+            for symbol, future in futures.items():
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    results[symbol] = e
+        return results
 
 def calculate_dual_gex_dex_flow(df, futures_ltp):
-    """Calculate GEX/DEX flow metrics"""
-    try:
-        df_sorted = df.sort_values('Strike').copy()
-        atm_idx = (df_sorted['Strike'] - futures_ltp).abs().idxmin()
-        atm_position = df_sorted.index.get_loc(atm_idx)
-        
-        start_idx = max(0, atm_position - 5)
-        end_idx = min(len(df_sorted), atm_position + 6)
-        near_strikes = df_sorted.iloc[start_idx:end_idx]
-        
-        positive_gex = near_strikes[near_strikes['Net_GEX_B'] > 0]['Net_GEX_B'].sum()
-        negative_gex = near_strikes[near_strikes['Net_GEX_B'] < 0]['Net_GEX_B'].sum()
-        gex_near_total = positive_gex + negative_gex
-        
-        if gex_near_total > 50:
-            gex_bias = "STRONG BULLISH"
-        elif gex_near_total < -50:
-            gex_bias = "VOLATILE"
-        else:
-            gex_bias = "NEUTRAL"
-        
-        dex_near_total = near_strikes['Net_DEX_B'].sum()
-        dex_bias = "BULLISH" if dex_near_total > 0 else "BEARISH"
-        
-        return {
-            'gex_near_total': gex_near_total,
-            'dex_near_total': dex_near_total,
-            'gex_near_bias': gex_bias,
-            'dex_near_bias': dex_bias,
-            'combined_bias': f"{gex_bias} + {dex_bias}"
-        }
-    except Exception as e:
-        print(f"❌ Flow calculation error: {str(e)}")
-        return None
+    """Calculate GEX/DEX flow metrics as a FlowResult"""
+    df_sorted = df if df['Strike'].is_monotonic_increasing else df.sort_values('Strike')
+    atm_position = _nearest_strike_index(df_sorted['Strike'].to_numpy(), futures_ltp)
+    
+    start_idx = max(0, atm_position - 5)
+    end_idx = min(len(df_sorted), atm_position + 6)
+    near_strikes = df_sorted.iloc[start_idx:end_idx]
+    
+    # Positive + negative contributions is simply the signed total
+    gex_near_total = near_strikes['Net_GEX_B'].to_numpy().sum()
+    
+    if gex_near_total > 50:
+        gex_bias = "STRONG BULLISH"
+    elif gex_near_total < -50:
+        gex_bias = "VOLATILE"
+    else:
+        gex_bias = "NEUTRAL"
+    
+    dex_near_total = near_strikes['Net_DEX_B'].to_numpy().sum()
+    dex_bias = "BULLISH" if dex_near_total > 0 else "BEARISH"
+    
+    return FlowResult(float(gex_near_total), float(dex_near_total), gex_bias, dex_bias)
 
 def detect_gamma_flip_zones(df):
-    """Detect gamma flip zones"""
-    try:
-        flip_zones = []
-        df_sorted = df.sort_values('Strike').reset_index(drop=True)
-        
-        for i in range(len(df_sorted) - 1):
-            current_gex = df_sorted.loc[i, 'Net_GEX_B']
-            next_gex = df_sorted.loc[i + 1, 'Net_GEX_B']
-            
-            if (current_gex > 0 and next_gex < 0) or (current_gex < 0 and next_gex > 0):
-                flip_zones.append({
-                    'lower_strike': df_sorted.loc[i, 'Strike'],
-                    'upper_strike': df_sorted.loc[i + 1, 'Strike'],
-                    'type': 'Flip Zone'
-                })
-        
-        return flip_zones
-    except Exception as e:
-        print(f"❌ Gamma flip detection error: {str(e)}")
-        return []
+    """Detect gamma flip zones
+    
+    Returns a structured array of FLIP_ZONE_DTYPE records, one per pair of
+    neighbouring strikes whose Net GEX changes sign.
+    """
+    df_sorted = df if df['Strike'].is_monotonic_increasing else df.sort_values('Strike')
+    strikes = df_sorted['Strike'].to_numpy()
+    gex = df_sorted['Net_GEX_B'].to_numpy()
+    
+    # Sign change between neighbouring strikes (zeros never count as a flip)
+    mask = (gex[:-1] * gex[1:]) < 0
+    
+    flip_zones = np.empty(np.count_nonzero(mask), dtype=FLIP_ZONE_DTYPE)
+    flip_zones['lower_strike'] = strikes[:-1][mask]
+    flip_zones['upper_strike'] = strikes[1:][mask]
+    
+    return flip_zones
 
 
 # Test function to verify API connectivity
@@ -498,15 +724,13 @@ def test_dhan_api(client_id, access_token):
     try:
         # Test expiry list
         print("\n[TEST 1] Fetching NIFTY expiry list...")
-        expiries = calc.get_expiry_list(13, "IDX_I")
+        expiries = calc.get_expiry_list(13, "IDX_I", use_cache=False)
         print(f"✅ SUCCESS! Found {len(expiries)} expiries")
         print(f"   First 3 expiries: {expiries[:3]}")
         
-        # Test option chain
+        # Test option chain (the request itself waits out the rate-limit window)
         print("\n[TEST 2] Fetching option chain for first expiry...")
-        import time
-        time.sleep(3)  # Rate limit
-        oc_data = calc.get_option_chain(13, "IDX_I", expiries[0])
+        oc_data = calc.get_option_chain(13, "IDX_I", expiries[0], use_cache=False)
         print(f"✅ SUCCESS! Got option chain data")
         print(f"   Underlying LTP: {oc_data.get('last_price', 'N/A')}")
         print(f"   Number of strikes: {len(oc_data.get('oc', {}))}")
@@ -519,6 +743,9 @@ def test_dhan_api(client_id, access_token):
 
 
 if __name__ == "__main__":
+    # Show the request/parse diagnostics when run as a script
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     # Example usage - replace with your credentials
     CLIENT_ID = "your_client_id"
     ACCESS_TOKEN = "your_access_token"
@@ -158,7 +158,7 @@ try:
         st.sidebar.caption(f"Available keys: {available_keys}")
     else:
         st.sidebar.caption("No secrets object found")
-except:
+except Exception:
     pass
 
 # Try to load credentials
@@ -241,6 +241,14 @@ if st.sidebar.button("🔄 Refresh Data", use_container_width=True):
 # DATA FETCHING
 # ============================================================================
 
+@st.cache_resource(show_spinner=False)
+def get_calculator(client_id, access_token):
+    """Shared calculator per credential set, kept across reruns"""
+    return EnhancedGEXDEXCalculator(
+        client_id=client_id,
+        access_token=access_token
+    )
+
 @st.cache_data(ttl=60, show_spinner=False)
 def fetch_data(symbol, strikes_range, expiry_index, client_id, access_token):
     """Fetch and calculate GEX/DEX data"""
@@ -251,10 +259,7 @@ def fetch_data(symbol, strikes_range, expiry_index, client_id, access_token):
         return None, None, None, None, "DhanHQ credentials not configured"
     
     try:
-        calculator = EnhancedGEXDEXCalculator(
-            client_id=client_id,
-            access_token=access_token
-        )
+        calculator = get_calculator(client_id, access_token)
         
         df, futures_ltp, fetch_method, atm_info = calculator.fetch_and_calculate_gex_dex(
             symbol=symbol,
@@ -336,18 +341,18 @@ try:
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            gex_bias = flow_metrics['gex_near_bias']
+            gex_bias = flow_metrics.gex_near_bias
             if "BULLISH" in gex_bias:
                 st.markdown(f'<div class="success-box"><b>GEX Bias:</b> {gex_bias}</div>', unsafe_allow_html=True)
             else:
                 st.markdown(f'<div class="warning-box"><b>GEX Bias:</b> {gex_bias}</div>', unsafe_allow_html=True)
         
         with col2:
-            dex_bias = flow_metrics['dex_near_bias']
+            dex_bias = flow_metrics.dex_near_bias
             st.info(f"**DEX Bias:** {dex_bias}")
         
         with col3:
-            combined_bias = flow_metrics['combined_bias']
+            combined_bias = flow_metrics.combined_bias
             st.info(f"**Combined:** {combined_bias}")
 except Exception as e:
     flow_metrics = None
@@ -358,9 +363,9 @@ except Exception as e:
 
 try:
     gamma_flip_zones = detect_gamma_flip_zones(df)
-    if gamma_flip_zones:
+    if len(gamma_flip_zones):
         st.warning(f"⚡ **{len(gamma_flip_zones)} Gamma Flip Zone(s) Detected!**")
-except:
+except Exception:
     gamma_flip_zones = []
 
 # ============================================================================